@@ -46,6 +46,9 @@ EXTRA_REQUIRE = {
         "batman-package",
         "rebound; sys_platform != 'win32'",
         "starry; sys_platform != 'win32'",
+        "numba",
+        "jax; sys_platform != 'win32'",
+        "jaxlib; sys_platform != 'win32'",
     ],
     "docs": [
         "sphinx>=1.7.5",
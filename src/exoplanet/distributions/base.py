@@ -52,10 +52,19 @@ class UnitVector(pm.Normal):
     For a multidimensional shape, the normalization is performed along the
     last dimension.
 
+    Args:
+        scale: The scale of the unconstrained parameters that are used for
+            sampling. See :class:`UnitVectorTransform` for more details.
+
     """
 
     def __init__(self, *args, **kwargs):
-        kwargs["transform"] = tr.unit_vector
+        if "scale" in kwargs:
+            kwargs["transform"] = tr.UnitVectorTransform(
+                scale=kwargs.pop("scale")
+            )
+        else:
+            kwargs["transform"] = tr.unit_vector
         super(UnitVector, self).__init__(*args, **kwargs)
 
     def _random(self, size=None):
@@ -19,6 +19,10 @@ class QuadLimbDark(pm.Flat):
     two-parameter limb darkening model to allow for efficient and
     uninformative sampling.
 
+    Args:
+        whiten: If ``True``, rescale the parameters used for sampling. See
+            :class:`QuadLimbDarkTransform` for more details.
+
     """
 
     __citations__ = ("kipping13",)
@@ -36,7 +40,10 @@ class QuadLimbDark(pm.Flat):
                 raise ValueError("the first dimension should be exactly 2")
 
         kwargs["shape"] = shape
-        kwargs["transform"] = tr.quad_limb_dark
+        if kwargs.pop("whiten", False):
+            kwargs["transform"] = tr.QuadLimbDarkTransform(whiten=True)
+        else:
+            kwargs["transform"] = tr.quad_limb_dark
 
         super(QuadLimbDark, self).__init__(*args, **kwargs)
 
@@ -9,10 +9,36 @@ __all__ = [
     "impact_parameter",
 ]
 
+import math
+
 import numpy as np
 import pymc3.distributions.transforms as tr
+import theano
 import theano.tensor as tt
 from pymc3.distributions import draw_values
+from scipy.special import logit
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _stack_pair(a, b):
+    """Stack two tensors with the same shape along a new leading axis"""
+    a = tt.as_tensor_variable(a)
+    b = tt.as_tensor_variable(b)
+    out = tt.zeros(
+        [2] + [a.shape[i] for i in range(a.ndim)],
+        dtype=theano.scalar.upcast(a.dtype, b.dtype),
+    )
+    out = tt.set_subtensor(out[0], a)
+    return tt.set_subtensor(out[1], b)
+
+
+def _logit_jac(y):
+    """The log Jacobian of the sigmoid: log(sigmoid(y) * (1 - sigmoid(y)))"""
+    return -2 * tt.nnet.softplus(-y) - y
 
 
 class AbsoluteValueTransform(tr.Transform):
@@ -29,11 +55,10 @@ class AbsoluteValueTransform(tr.Transform):
         return tt.log(q) - tt.log(1 - q)
 
     def forward_val(self, x, point=None):
-        q = 0.5 * (x + 1)
-        return np.log(q) - np.log(1 - q)
+        return logit(0.5 * (x + 1))
 
     def jacobian_det(self, y):
-        return -2 * tt.nnet.softplus(-y) - y
+        return _logit_jac(y)
 
 
 absolute_value = AbsoluteValueTransform()
@@ -45,10 +70,29 @@ class UnitVectorTransform(tr.Transform):
     The variable is normalized so that the sum of squares over the last axis
     is unity.
 
+    Args:
+        scale: The standard deviation of the isotropic normal distribution
+            over the unconstrained parameters. This has no effect on the
+            distribution over the transformed parameter, but it sets the
+            scale of the parameters seen by the sampler.
+
     """
 
     name = "unitvector"
 
+    def __init__(self, scale=1.0):
+        if np.ndim(scale) != 0:
+            raise ValueError("the scale must be a scalar")
+        if isinstance(scale, tt.Variable):
+            self.scale = scale
+        elif scale <= 0:
+            raise ValueError("the scale must be positive")
+        elif scale == 1.0:
+            # Keep the default graph free of the rescaling
+            self.scale = None
+        else:
+            self.scale = tt.constant(scale, dtype=theano.config.floatX)
+
     def backward(self, y):
         norm = tt.sqrt(tt.sum(tt.square(y), axis=-1, keepdims=True))
         return y / norm
@@ -60,7 +104,11 @@ class UnitVectorTransform(tr.Transform):
         return np.copy(x)
 
     def jacobian_det(self, y):
-        return -0.5 * tt.sum(tt.square(y), axis=-1)
+        if self.scale is None:
+            return -0.5 * tt.sum(tt.square(y), axis=-1)
+        z = y / self.scale
+        norm = tt.cast(y.shape[-1], y.dtype) * tt.log(self.scale)
+        return -0.5 * tt.sum(tt.square(z), axis=-1) - norm
 
 
 unit_vector = UnitVectorTransform()
@@ -76,22 +124,38 @@ class UnitDiskTransform(tr.Transform):
 
     name = "unitdisk"
 
+    # Note: 1 - y[0]**2 is evaluated as (1 - y[0]) * (1 + y[0]) throughout to
+    # avoid cancellation near the edge of the disk
+
     def backward(self, y):
-        return tt.stack([y[0], y[1] * tt.sqrt(1 - y[0] ** 2)])
+        one_minus_sq = (1 - y[0]) * (1 + y[0])
+        return _stack_pair(y[0], y[1] * tt.sqrt(one_minus_sq))
 
     def forward(self, x):
-        return tt.stack([x[0], x[1] / tt.sqrt(1 - x[0] ** 2)])
+        one_minus_sq = (1 - x[0]) * (1 + x[0])
+        return _stack_pair(x[0], x[1] / tt.sqrt(one_minus_sq))
 
     def forward_val(self, x, point=None):
-        return np.array([x[0], x[1] / np.sqrt(1 - x[0] ** 2)])
+        return np.stack(
+            (x[0], x[1] / np.sqrt((1 - x[0]) * (1 + x[0]))), axis=0
+        )
 
     def jacobian_det(self, y):
-        return tt.stack((tt.zeros_like(y[0]), 0.5 * tt.log(1 - y[0] ** 2)))
+        log_one_minus_sq = tt.log1p(-y[0]) + tt.log1p(y[0])
+        return tt.set_subtensor(tt.zeros_like(y)[1], 0.5 * log_one_minus_sq)
 
 
 unit_disk = tr.Chain([UnitDiskTransform(), tr.Interval(-1, 1)])
 
 
+def _angle_jac(y, regularized):
+    """The log density over the (sin, cos) plane for the angle transforms"""
+    sm = tt.sum(y * y, axis=0)
+    if regularized is not None:
+        return regularized * tt.log(sm) - 0.5 * sm
+    return -0.5 * sm
+
+
 class AngleTransform(tr.Transform):
     """An angle transformation
 
@@ -117,18 +181,13 @@ class AngleTransform(tr.Transform):
         return tt.arctan2(y[0], y[1])
 
     def forward(self, x):
-        return tt.concatenate(
-            (tt.shape_padleft(tt.sin(x)), tt.shape_padleft(tt.cos(x))), axis=0
-        )
+        return _stack_pair(tt.sin(x), tt.cos(x))
 
     def forward_val(self, x, point=None):
-        return np.array([np.sin(x), np.cos(x)])
+        return np.stack((np.sin(x), np.cos(x)), axis=0)
 
     def jacobian_det(self, y):
-        sm = tt.sum(tt.square(y), axis=0)
-        if self.regularized is not None:
-            return self.regularized * tt.log(sm) - 0.5 * sm
-        return -0.5 * sm
+        return _angle_jac(y, self.regularized)
 
 
 angle = AngleTransform()
@@ -153,10 +212,22 @@ class PeriodicTransform(tr.Transform):
     name = "periodic"
 
     def __init__(self, lower=0, upper=1, **kwargs):
-        self.mid = tt.as_tensor_variable(0.5 * (lower + upper))
-        self.delta = tt.as_tensor_variable(0.5 * (upper - lower) / np.pi)
+        lower = np.asarray(lower)
+        upper = np.asarray(upper)
+        if not (
+            np.issubdtype(lower.dtype, np.number)
+            and np.issubdtype(upper.dtype, np.number)
+        ):
+            raise TypeError("the bounds 'lower' and 'upper' must be numeric")
+
         self.mid_ = 0.5 * (lower + upper)
         self.delta_ = 0.5 * (upper - lower) / np.pi
+        self.inv_delta_ = 1.0 / self.delta_
+
+        dtype = theano.config.floatX
+        self.mid = tt.constant(self.mid_, dtype=dtype)
+        self.delta = tt.constant(self.delta_, dtype=dtype)
+        self.inv_delta = tt.constant(self.inv_delta_, dtype=dtype)
         self.regularized = kwargs.pop("regularized", 10.0)
         super(PeriodicTransform, self).__init__(**kwargs)
 
@@ -164,20 +235,15 @@ class PeriodicTransform(tr.Transform):
         return self.mid + self.delta * tt.arctan2(y[0], y[1])
 
     def forward(self, x):
-        a = (x - self.mid) / self.delta
-        return tt.concatenate(
-            (tt.shape_padleft(tt.sin(a)), tt.shape_padleft(tt.cos(a))), axis=0
-        )
+        a = (x - self.mid) * self.inv_delta
+        return _stack_pair(tt.sin(a), tt.cos(a))
 
     def forward_val(self, x, point=None):
-        a = (x - self.mid_) / self.delta_
-        return np.array([np.sin(a), np.cos(a)])
+        a = (x - self.mid_) * self.inv_delta_
+        return np.stack((np.sin(a), np.cos(a)), axis=0)
 
     def jacobian_det(self, y):
-        sm = tt.sum(tt.square(y), axis=0)
-        if self.regularized is not None:
-            return self.regularized * tt.log(sm) - 0.5 * sm
-        return -0.5 * sm
+        return _angle_jac(y, self.regularized)
 
 
 class QuadLimbDarkTransform(tr.Transform):
@@ -185,14 +251,41 @@ class QuadLimbDarkTransform(tr.Transform):
 
     Ref: https://arxiv.org/abs/1308.0009
 
+    Args:
+        whiten: If ``True``, the unconstrained parameters are rescaled using
+            the Cholesky factor of their covariance under the prior so that
+            the sampler sees parameters with unit variance. This has no
+            effect on the distribution over the transformed parameters.
+
     """
 
     name = "quadlimbdark"
 
+    def __init__(self, whiten=False):
+        self.whiten = whiten
+        if whiten:
+            # The q parameters are uniform under the Kipping (2013) prior so
+            # their logits are independent standard logistic variables
+            L = np.linalg.cholesky(np.pi ** 2 / 3 * np.eye(2))
+            self.L_ = L
+            self.L_inv_ = np.linalg.inv(L)
+            dtype = theano.config.floatX
+            self.L = tt.constant(self.L_, dtype=dtype)
+            self.L_inv = tt.constant(self.L_inv_, dtype=dtype)
+            self.log_diag_L = tt.constant(np.log(np.diag(L)), dtype=dtype)
+        super(QuadLimbDarkTransform, self).__init__()
+
+    def _unwhiten(self, y):
+        if self.whiten:
+            return tt.tensordot(self.L, y, axes=[[1], [0]])
+        return y
+
     def backward(self, y):
-        q = tt.nnet.sigmoid(y)
-        sqrtq1 = tt.sqrt(q[0])
-        twoq2 = 2 * q[1]
+        y = self._unwhiten(y)
+        s0 = tt.nnet.sigmoid(y[0])
+        s1 = tt.nnet.sigmoid(y[1])
+        sqrtq1 = tt.sqrt(s0)
+        twoq2 = 2 * s1
         u = tt.stack([sqrtq1 * twoq2, sqrtq1 * (1 - twoq2)])
 
         return u
@@ -200,20 +293,59 @@ class QuadLimbDarkTransform(tr.Transform):
     def forward(self, x):
         usum = tt.sum(x, axis=0)
         q = tt.stack([usum ** 2, 0.5 * x[0] / usum])
-        return tt.log(q) - tt.log(1 - q)
+        y = tt.log(q) - tt.log(1 - q)
+        if self.whiten:
+            return tt.tensordot(self.L_inv, y, axes=[[1], [0]])
+        return y
 
     def forward_val(self, x, point=None):
         usum = np.sum(x, axis=0)
-        q = np.array([usum ** 2, 0.5 * x[0] / usum])
-        return np.log(q) - np.log(1 - q)
+        q = np.stack((usum ** 2, 0.5 * x[0] / usum), axis=0)
+        y = logit(q)
+        if self.whiten:
+            return np.tensordot(self.L_inv_, y, axes=[[1], [0]])
+        return y
 
     def jacobian_det(self, y):
-        return -2 * tt.nnet.softplus(-y) - y
+        y = tt.as_tensor_variable(y)
+        jac = _logit_jac(self._unwhiten(y))
+        if self.whiten:
+            # L is triangular so log|det(L)| is the sum of the log diagonal
+            return jac + tt.shape_padright(self.log_diag_L, y.ndim - 1)
+        return jac
 
 
 quad_limb_dark = QuadLimbDarkTransform()
 
 
+# The reparameterized coordinates are clipped to this distance from the
+# boundaries of the unit interval so that the logit is always finite
+_RADIUS_IMPACT_EPS = 1e-12
+
+
+def _radius_impact_forward_val_py(p, b, pl, Ar, dr, out):
+    for i in range(p.shape[0]):
+        if b[i] <= 1:
+            r0 = (b[i] / (1 + pl) - 1) * (1 - Ar) + 1
+            r1 = (p[i] - pl) / dr
+        else:
+            arg = p[i] - b[i] - dr + 1
+            r0 = (arg / dr) ** 2 * Ar
+            r1 = (pl - b[i] + 1) / arg
+        r0 = min(max(r0, _RADIUS_IMPACT_EPS), 1 - _RADIUS_IMPACT_EPS)
+        r1 = min(max(r1, _RADIUS_IMPACT_EPS), 1 - _RADIUS_IMPACT_EPS)
+        out[0, i] = math.log(r0) - math.log1p(-r0)
+        out[1, i] = math.log(r1) - math.log1p(-r1)
+
+
+if njit is None:
+    _radius_impact_forward_val = None
+else:
+    _radius_impact_forward_val = njit(cache=True, error_model="numpy")(
+        _radius_impact_forward_val_py
+    )
+
+
 class RadiusImpactTransform(tr.Transform):
     """A reparameterization of the radius-impact parameter plane
 
@@ -229,13 +361,44 @@ class RadiusImpactTransform(tr.Transform):
     name = "radiusimpact"
 
     def __init__(self, min_radius, max_radius):
-        self.min_radius = tt.as_tensor_variable(min_radius)
-        self.max_radius = tt.as_tensor_variable(max_radius)
-
-        # Compute Ar from Espinoza
-        self.dr = self.max_radius - self.min_radius
-        denom = 2 + self.min_radius + self.max_radius
-        self.Ar = self.dr / denom
+        if isinstance(min_radius, tt.Variable) or isinstance(
+            max_radius, tt.Variable
+        ):
+            self.min_radius = tt.as_tensor_variable(min_radius)
+            self.max_radius = tt.as_tensor_variable(max_radius)
+
+            # Compute Ar from Espinoza
+            self.dr = self.max_radius - self.min_radius
+            denom = 2 + self.min_radius + self.max_radius
+            self.Ar = self.dr / denom
+
+            self.one_plus_pl = 1 + self.min_radius
+            self.one_minus_Ar = 1 - self.Ar
+            self.inv_dr = 1 / self.dr
+
+            self._pl_np = self._Ar_np = self._dr_np = None
+
+        else:
+            # The bounds are fixed so the derived parameters are computed
+            # once here and added to the graph as constants
+            pl = np.asarray(min_radius, dtype=float)
+            pu = np.asarray(max_radius, dtype=float)
+            dr = pu - pl
+            Ar = dr / (2 + pl + pu)
+
+            # Keep the numerical values for use in 'forward_val'
+            self._pl_np = pl
+            self._Ar_np = Ar
+            self._dr_np = dr
+
+            dtype = theano.config.floatX
+            self.min_radius = tt.constant(pl, dtype=dtype)
+            self.max_radius = tt.constant(pu, dtype=dtype)
+            self.dr = tt.constant(dr, dtype=dtype)
+            self.Ar = tt.constant(Ar, dtype=dtype)
+            self.one_plus_pl = tt.constant(1 + pl, dtype=dtype)
+            self.one_minus_Ar = tt.constant(1 - Ar, dtype=dtype)
+            self.inv_dr = tt.constant(1 / dr, dtype=dtype)
 
     def backward(self, y):
         y = tt.nnet.sigmoid(y)
@@ -243,63 +406,90 @@ class RadiusImpactTransform(tr.Transform):
         r2 = y[1]
         pl, pu = self.min_radius, self.max_radius
 
-        b1 = (1 + pl) * (1 + (r1 - 1) / (1 - self.Ar))
+        b1 = self.one_plus_pl * (1 + (r1 - 1) / self.one_minus_Ar)
         p1 = pl + r2 * self.dr
 
         q1 = r1 / self.Ar
         q2 = r2
-        b2 = (1 + pl) + tt.sqrt(q1) * q2 * self.dr
+        b2 = self.one_plus_pl + tt.sqrt(q1) * q2 * self.dr
         p2 = pu - self.dr * tt.sqrt(q1) * (1 - q2)
 
-        pb = tt.switch(
-            r1 > self.Ar,
-            tt.stack((p1, b1), axis=0),
-            tt.stack((p2, b2), axis=0),
-        )
-        return pb
+        # Both branches are finite for any y so they can be blended without
+        # a switch
+        m = tt.cast(r1 > self.Ar, theano.config.floatX)
+        p = m * p1 + (1 - m) * p2
+        b = m * b1 + (1 - m) * b2
+        return _stack_pair(p, b)
 
     def forward(self, x):
         p = x[0]
         b = x[1]
         pl = self.min_radius
 
-        r11 = (b / (1 + pl) - 1) * (1 - self.Ar) + 1
-        r21 = (p - pl) / self.dr
+        r11 = (b / self.one_plus_pl - 1) * self.one_minus_Ar + 1
+        r21 = (p - pl) * self.inv_dr
 
         arg = p - b - self.dr + 1
-        q1 = (arg / self.dr) ** 2
+        q1 = (arg * self.inv_dr) ** 2
         q2 = (pl - b + 1) / arg
         r12 = q1 * self.Ar
         r22 = q2
 
-        y = tt.switch(
-            b <= 1, tt.stack((r11, r21), axis=0), tt.stack((r12, r22), axis=0)
-        )
+        # The second branch can be infinite when b <= 1 so this one needs to
+        # stay a switch, but it is applied per component before stacking
+        m = b <= 1
+        y = _stack_pair(tt.switch(m, r11, r12), tt.switch(m, r21, r22))
+        y = tt.clip(y, _RADIUS_IMPACT_EPS, 1 - _RADIUS_IMPACT_EPS)
 
-        return tt.log(y) - tt.log(1 - y)
+        return tt.log(y) - tt.log1p(-y)
 
     def forward_val(self, x, point=None):
         p = x[0]
         b = x[1]
-        pl, Ar, dr = draw_values(
-            [self.min_radius - 0.0, self.Ar - 0.0, self.dr - 0.0], point=point
-        )
-
+        if self._pl_np is None:
+            pl, Ar, dr = draw_values(
+                [self.min_radius - 0.0, self.Ar - 0.0, self.dr - 0.0],
+                point=point,
+            )
+        else:
+            pl, Ar, dr = self._pl_np, self._Ar_np, self._dr_np
+
+        # Use the compiled kernel when numba is installed and the radius
+        # bounds are scalars
+        if _radius_impact_forward_val is not None and all(
+            np.ndim(v) == 0 for v in (pl, Ar, dr)
+        ):
+            out = np.empty((2, np.size(p)))
+            _radius_impact_forward_val(
+                np.ravel(np.asarray(p, dtype=float)),
+                np.ravel(np.asarray(b, dtype=float)),
+                float(pl),
+                float(Ar),
+                float(dr),
+                out,
+            )
+
+            # Match the output type of the NumPy implementation below
+            dtype = np.result_type(x, pl, Ar, dr)
+            return out.reshape(np.shape(x)).astype(dtype, copy=False)
+
+        # This handles any bounds that broadcast against the input, so it is
+        # used for array bounds even when numba is installed. Both branches
+        # are evaluated over the full array and then selected; the second
+        # can be singular where b <= 1 but those values are discarded.
         m = b <= 1
-        r = np.empty_like(x)
-        r[0, m] = (b[m] / (1 + pl) - 1) * (1 - Ar) + 1
-        r[1, m] = (p[m] - pl) / dr
-
-        arg = p[~m] - b[~m] - dr + 1
-        q1 = (arg / dr) ** 2
-        q2 = (pl - b[~m] + 1) / arg
-        r[0, ~m] = q1 * Ar
-        r[1, ~m] = q2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            arg = p - b - dr + 1
+            r0 = np.where(
+                m, (b / (1 + pl) - 1) * (1 - Ar) + 1, (arg / dr) ** 2 * Ar
+            )
+            r1 = np.where(m, (p - pl) / dr, (pl - b + 1) / arg)
+        r = np.stack((r0, r1), axis=0)
 
-        return np.log(r) - np.log(1 - r)
+        return logit(np.clip(r, _RADIUS_IMPACT_EPS, 1 - _RADIUS_IMPACT_EPS))
 
     def jacobian_det(self, y):
-        return -2 * tt.nnet.softplus(-y) - y
+        return _logit_jac(y)
 
 
 radius_impact = RadiusImpactTransform
@@ -311,10 +501,10 @@ class ImpactParameterTransform(tr.LogOdds):
 
     def __init__(self, ror):
         self.one_plus_ror = 1 + tt.as_tensor_variable(ror)
+        self.inv_one_plus_ror = tt.inv(self.one_plus_ror)
 
     def backward(self, x):
-        bhat = super(ImpactParameterTransform, self).backward(x)
-        return bhat * self.one_plus_ror
+        return tt.nnet.sigmoid(x) * self.one_plus_ror
 
     def backward_val(self, x):
         raise NotImplementedError(
@@ -322,21 +512,18 @@ class ImpactParameterTransform(tr.LogOdds):
         )
 
     def forward(self, x):
-        return super(ImpactParameterTransform, self).forward(
-            x / self.one_plus_ror
-        )
+        scaled = x * self.inv_one_plus_ror
+        return tt.log(scaled) - tt.log1p(-scaled)
 
     def forward_val(self, x, point=None):
         (opror,) = draw_values([self.one_plus_ror - 0.0], point=point)
-        return super(ImpactParameterTransform, self).forward_val(
-            x / opror, point=point
-        )
+        return logit(x / opror)
 
     def jacobian_det(self, y):
-        # This is y here, not y / (1 + ror) because the jacobian is computed
-        # using the 'backward' op *of this transform* not its super.
-        jac = super(ImpactParameterTransform, self).jacobian_det(y)
-        return jac - tt.log(self.one_plus_ror)
+        # The derivative of 'backward' contributes a factor of (1 + ror) that
+        # cancels with the normalization of the uniform distribution for the
+        # impact parameter, leaving just the Jacobian of the sigmoid
+        return _logit_jac(y)
 
 
 impact_parameter = ImpactParameterTransform
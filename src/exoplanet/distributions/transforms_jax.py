@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+
+__all__ = [
+    "AbsoluteValueTransform",
+    "UnitVectorTransform",
+    "UnitDiskTransform",
+    "AngleTransform",
+    "PeriodicTransform",
+    "QuadLimbDarkTransform",
+    "RadiusImpactTransform",
+    "ImpactParameterTransform",
+]
+
+from functools import partial
+
+import numpy as np
+
+try:
+    import jax
+    import jax.numpy as jnp
+    from jax.scipy.special import logit
+except ImportError as e:
+    raise ImportError("jax is required to use the JAX transforms") from e
+
+
+# Matches the clipping used by the PyMC3 RadiusImpactTransform
+_RADIUS_IMPACT_EPS = 1e-12
+
+
+def _logit_jac(y):
+    return 2 * jax.nn.log_sigmoid(y) - y
+
+
+class Transform(object):
+    """The base class for the JAX implementations of the transforms
+
+    These mirror the PyMC3 transforms defined in
+    :mod:`exoplanet.distributions.transforms` with the same ``forward``,
+    ``backward``, and ``jacobian_det`` interface, but they operate on JAX
+    arrays and each method is compiled using ``jax.jit``. The parameters
+    passed to the constructors are treated as compile time constants, except
+    for ``ror`` in :class:`ImpactParameterTransform`.
+
+    """
+
+    name = ""
+
+
+class AbsoluteValueTransform(Transform):
+    name = "absolutevalue"
+
+    @partial(jax.jit, static_argnums=(0,))
+    def backward(self, y):
+        return jnp.abs(2 * jax.nn.sigmoid(y) - 1)
+
+    @partial(jax.jit, static_argnums=(0,))
+    def forward(self, x):
+        return logit(0.5 * (x + 1))
+
+    @partial(jax.jit, static_argnums=(0,))
+    def jacobian_det(self, y):
+        return _logit_jac(y)
+
+
+class UnitVectorTransform(Transform):
+    name = "unitvector"
+
+    def __init__(self, scale=1.0):
+        if np.ndim(scale) != 0:
+            raise ValueError("the scale must be a scalar")
+        if scale <= 0:
+            raise ValueError("the scale must be positive")
+        self.scale = scale
+
+    @partial(jax.jit, static_argnums=(0,))
+    def backward(self, y):
+        return y / jnp.sqrt(jnp.sum(y * y, axis=-1, keepdims=True))
+
+    @partial(jax.jit, static_argnums=(0,))
+    def forward(self, x):
+        return jnp.asarray(x)
+
+    @partial(jax.jit, static_argnums=(0,))
+    def jacobian_det(self, y):
+        z = y / self.scale
+        norm = y.shape[-1] * np.log(self.scale)
+        return -0.5 * jnp.sum(z * z, axis=-1) - norm
+
+
+class UnitDiskTransform(Transform):
+    name = "unitdisk"
+
+    @partial(jax.jit, static_argnums=(0,))
+    def backward(self, y):
+        return jnp.stack([y[0], y[1] * jnp.sqrt((1 - y[0]) * (1 + y[0]))])
+
+    @partial(jax.jit, static_argnums=(0,))
+    def forward(self, x):
+        return jnp.stack([x[0], x[1] / jnp.sqrt((1 - x[0]) * (1 + x[0]))])
+
+    @partial(jax.jit, static_argnums=(0,))
+    def jacobian_det(self, y):
+        log_one_minus_sq = jnp.log1p(-y[0]) + jnp.log1p(y[0])
+        return jnp.stack([jnp.zeros_like(y[0]), 0.5 * log_one_minus_sq])
+
+
+class AngleTransform(Transform):
+    name = "angle"
+
+    def __init__(self, regularized=10.0):
+        self.regularized = regularized
+
+    @partial(jax.jit, static_argnums=(0,))
+    def backward(self, y):
+        return jnp.arctan2(y[0], y[1])
+
+    @partial(jax.jit, static_argnums=(0,))
+    def forward(self, x):
+        return jnp.stack([jnp.sin(x), jnp.cos(x)])
+
+    @partial(jax.jit, static_argnums=(0,))
+    def jacobian_det(self, y):
+        sm = jnp.sum(y * y, axis=0)
+        if self.regularized is not None:
+            return self.regularized * jnp.log(sm) - 0.5 * sm
+        return -0.5 * sm
+
+
+class PeriodicTransform(AngleTransform):
+    name = "periodic"
+
+    def __init__(self, lower=0, upper=1, regularized=10.0):
+        self.mid = 0.5 * (lower + upper)
+        self.delta = 0.5 * (upper - lower) / np.pi
+        self.inv_delta = 1.0 / self.delta
+        super(PeriodicTransform, self).__init__(regularized=regularized)
+
+    @partial(jax.jit, static_argnums=(0,))
+    def backward(self, y):
+        return self.mid + self.delta * jnp.arctan2(y[0], y[1])
+
+    @partial(jax.jit, static_argnums=(0,))
+    def forward(self, x):
+        a = (x - self.mid) * self.inv_delta
+        return jnp.stack([jnp.sin(a), jnp.cos(a)])
+
+
+class QuadLimbDarkTransform(Transform):
+    name = "quadlimbdark"
+
+    def __init__(self, whiten=False):
+        self.whiten = whiten
+        if whiten:
+            L = np.linalg.cholesky(np.pi ** 2 / 3 * np.eye(2))
+            self.L = L
+            self.L_inv = np.linalg.inv(L)
+            self.log_diag_L = np.log(np.diag(L))
+
+    def _unwhiten(self, y):
+        if self.whiten:
+            return jnp.tensordot(self.L, y, axes=[[1], [0]])
+        return y
+
+    @partial(jax.jit, static_argnums=(0,))
+    def backward(self, y):
+        q = jax.nn.sigmoid(self._unwhiten(y))
+        sqrtq1 = jnp.sqrt(q[0])
+        twoq2 = 2 * q[1]
+        return jnp.stack([sqrtq1 * twoq2, sqrtq1 * (1 - twoq2)])
+
+    @partial(jax.jit, static_argnums=(0,))
+    def forward(self, x):
+        usum = jnp.sum(x, axis=0)
+        y = logit(jnp.stack([usum ** 2, 0.5 * x[0] / usum]))
+        if self.whiten:
+            return jnp.tensordot(self.L_inv, y, axes=[[1], [0]])
+        return y
+
+    @partial(jax.jit, static_argnums=(0,))
+    def jacobian_det(self, y):
+        jac = _logit_jac(self._unwhiten(y))
+        if self.whiten:
+            return jac + jnp.reshape(
+                self.log_diag_L, (2,) + (1,) * (y.ndim - 1)
+            )
+        return jac
+
+
+class RadiusImpactTransform(Transform):
+    name = "radiusimpact"
+
+    def __init__(self, min_radius, max_radius):
+        self.min_radius = float(min_radius)
+        self.max_radius = float(max_radius)
+
+        # Compute Ar from Espinoza
+        self.dr = self.max_radius - self.min_radius
+        self.Ar = self.dr / (2 + self.min_radius + self.max_radius)
+
+    @partial(jax.jit, static_argnums=(0,))
+    def backward(self, y):
+        r1, r2 = jax.nn.sigmoid(y)
+        pl, pu, dr, Ar = self.min_radius, self.max_radius, self.dr, self.Ar
+
+        b1 = (1 + pl) * (1 + (r1 - 1) / (1 - Ar))
+        p1 = pl + r2 * dr
+
+        sqrtq1 = jnp.sqrt(r1 / Ar)
+        b2 = (1 + pl) + sqrtq1 * r2 * dr
+        p2 = pu - dr * sqrtq1 * (1 - r2)
+
+        m = r1 > Ar
+        return jnp.stack([jnp.where(m, p1, p2), jnp.where(m, b1, b2)])
+
+    @partial(jax.jit, static_argnums=(0,))
+    def forward(self, x):
+        p, b = x[0], x[1]
+        pl, dr, Ar = self.min_radius, self.dr, self.Ar
+        m = b <= 1
+
+        r11 = (b / (1 + pl) - 1) * (1 - Ar) + 1
+        r21 = (p - pl) / dr
+
+        # The second branch is singular for some points with b <= 1 so the
+        # argument is replaced there to keep the gradients finite
+        arg = jnp.where(m, 1.0, p - b - dr + 1)
+        r12 = (arg / dr) ** 2 * Ar
+        r22 = (pl - b + 1) / arg
+
+        y = jnp.stack([jnp.where(m, r11, r12), jnp.where(m, r21, r22)])
+        return logit(jnp.clip(y, _RADIUS_IMPACT_EPS, 1 - _RADIUS_IMPACT_EPS))
+
+    @partial(jax.jit, static_argnums=(0,))
+    def jacobian_det(self, y):
+        return _logit_jac(y)
+
+
+@jax.jit
+def _impact_backward(x, one_plus_ror):
+    return jax.nn.sigmoid(x) * one_plus_ror
+
+
+@jax.jit
+def _impact_forward(x, one_plus_ror):
+    return logit(x / one_plus_ror)
+
+
+class ImpactParameterTransform(Transform):
+    name = "impact"
+
+    def __init__(self, ror):
+        # 'ror' will generally be a model parameter so it is passed to the
+        # compiled functions as an argument instead of being a constant
+        self.one_plus_ror = 1 + jnp.asarray(ror)
+
+    def backward(self, x):
+        return _impact_backward(x, self.one_plus_ror)
+
+    def forward(self, x):
+        return _impact_forward(x, self.one_plus_ror)
+
+    @partial(jax.jit, static_argnums=(0,))
+    def jacobian_det(self, y):
+        # The log(1 + ror) from the derivative of 'backward' cancels with the
+        # normalization of the uniform prior on the impact parameter
+        return _logit_jac(y)
@@ -70,9 +70,10 @@ class TestBase(_Base):
             s, p = kstest(u[:, i], cdf)
             assert s < 0.05
 
-    def test_unit_vector(self):
+    @pytest.mark.parametrize("scale", [1.0, 2.0])
+    def test_unit_vector(self, scale):
         with self._model():
-            dist = UnitVector("x", shape=(2, 3))
+            dist = UnitVector("x", shape=(2, 3), scale=scale)
 
             # Test random sampling
             samples = dist.random(size=100)
@@ -2,6 +2,7 @@
 
 import numpy as np
 import pymc3 as pm
+import pytest
 from scipy.stats import kstest
 
 from exoplanet.distributions.physical import ImpactParameter, QuadLimbDark
@@ -12,9 +13,10 @@ from .base_test import _Base
 class TestPhysical(_Base):
     random_seed = 19860925
 
-    def test_quad_limb_dark(self):
+    @pytest.mark.parametrize("whiten", [False, True])
+    def test_quad_limb_dark(self, whiten):
         with self._model():
-            dist = QuadLimbDark("u", shape=2)
+            dist = QuadLimbDark("u", shape=2, whiten=whiten)
 
             # Test random sampling
             samples = dist.random(size=100)
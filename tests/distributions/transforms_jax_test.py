@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+import theano.tensor as tt
+
+from exoplanet.distributions import transforms as tr
+
+jax = pytest.importorskip("jax")
+trj = pytest.importorskip("exoplanet.distributions.transforms_jax")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def enable_x64():
+    # Compare to Theano in double precision without leaking the setting into
+    # the rest of the test session
+    previous = jax.config.read("jax_enable_x64")
+    jax.config.update("jax_enable_x64", True)
+    yield
+    jax.config.update("jax_enable_x64", previous)
+
+
+x_disk = np.array([[0.1, -0.5, 0.3], [0.2, 0.4, -0.9]])
+x_ld = np.array([[0.1, 0.5, 0.8], [0.2, 0.3, 0.1]])
+x_rb = np.array([[0.05, 0.08, 0.09], [0.5, 1.02, 1.05]])
+
+
+@pytest.mark.parametrize(
+    "name, args, x",
+    [
+        ("AbsoluteValueTransform", (), np.array([0.1, 0.5, 0.9])),
+        ("UnitVectorTransform", (), x_disk.T / np.sqrt(np.sum(x_disk ** 2))),
+        ("UnitVectorTransform", (2.0,), x_disk.T),
+        ("UnitDiskTransform", (), x_disk),
+        ("AngleTransform", (), np.array([-3.0, 0.1, 2.5])),
+        ("PeriodicTransform", (-3.2, 5.1), np.array([-3.0, 0.1, 4.5])),
+        ("QuadLimbDarkTransform", (), x_ld),
+        ("QuadLimbDarkTransform", (True,), x_ld),
+        ("RadiusImpactTransform", (0.01, 0.1), x_rb),
+        ("ImpactParameterTransform", (0.1,), np.array([0.1, 0.5, 1.05])),
+    ],
+)
+def test_consistent_with_theano(name, args, x):
+    trans = getattr(tr, name)(*args)
+    trans_jax = getattr(trj, name)(*args)
+
+    y = trans.forward(tt.as_tensor_variable(x)).eval()
+    assert np.allclose(trans_jax.forward(x), y)
+    assert np.allclose(
+        trans_jax.backward(y), trans.backward(tt.as_tensor_variable(y)).eval()
+    )
+    assert np.allclose(
+        trans_jax.jacobian_det(y),
+        trans.jacobian_det(tt.as_tensor_variable(y)).eval(),
+    )
+
+
+def test_vmap():
+    trans = trj.PeriodicTransform(-3.2, 5.1)
+    x = np.random.RandomState(42).uniform(-3.2, 5.1, (4, 10))
+    y = jax.vmap(trans.forward)(x)
+    assert np.allclose(jax.vmap(trans.backward)(y), x)
+
+
+@pytest.mark.parametrize("scale", [np.array([1.0, 2.0, 3.0]), 0.0, -1.0])
+def test_unit_vector_invalid_scale(scale):
+    with pytest.raises(ValueError):
+        trj.UnitVectorTransform(scale=scale)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+import theano
+import theano.tensor as tt
+
+from exoplanet.distributions import transforms as tr
+
+
+@pytest.mark.parametrize("symbolic", [True, False])
+@pytest.mark.parametrize("shape", [(2,), (2, 10), (2, 5, 3)])
+def test_radius_impact_forward_val(shape, symbolic):
+    np.random.seed(42)
+    min_radius, max_radius = 0.01, 0.1
+    if symbolic:
+        trans = tr.RadiusImpactTransform(
+            tt.as_tensor_variable(min_radius),
+            tt.as_tensor_variable(max_radius),
+        )
+    else:
+        trans = tr.RadiusImpactTransform(min_radius, max_radius)
+
+    # Sample on both sides of the b = 1 boundary
+    p = np.random.uniform(min_radius, max_radius, shape[1:])
+    b = np.random.uniform(0, 1 + p)
+    x = np.stack((p, b), axis=0)
+
+    y = trans.forward_val(x)
+    assert np.shape(y) == shape
+    assert np.all(np.isfinite(y))
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+    assert np.allclose(x, trans.backward(tt.as_tensor_variable(y)).eval())
+
+
+@pytest.mark.parametrize("shape", [(2,), (2, 10), (2, 5, 3)])
+def test_unit_disk(shape):
+    np.random.seed(1234)
+    trans = tr.UnitDiskTransform()
+    r = np.sqrt(np.random.uniform(0, 1, shape[1:]))
+    theta = np.random.uniform(-np.pi, np.pi, shape[1:])
+    x = np.stack((r * np.cos(theta), r * np.sin(theta)), axis=0)
+
+    y = trans.forward_val(x)
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+    assert np.allclose(x, trans.backward(tt.as_tensor_variable(y)).eval())
+
+    jac = trans.jacobian_det(tt.as_tensor_variable(y)).eval()
+    assert np.shape(jac) == shape
+    assert np.allclose(jac[0], 0.0)
+    assert np.allclose(jac[1], 0.5 * np.log(1 - x[0] ** 2))
+
+
+@pytest.mark.parametrize("shape", [(), (10,), (5, 3)])
+@pytest.mark.parametrize(
+    "trans", [tr.AngleTransform(), tr.PeriodicTransform(-3.2, 5.1)]
+)
+def test_angle(trans, shape):
+    np.random.seed(5678)
+    if isinstance(trans, tr.PeriodicTransform):
+        x = np.random.uniform(-3.2, 5.1, shape)
+    else:
+        x = np.random.uniform(-np.pi, np.pi, shape)
+
+    y = trans.forward_val(x)
+    assert np.shape(y) == (2,) + shape
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+    assert np.allclose(x, trans.backward(tt.as_tensor_variable(y)).eval())
+
+
+@pytest.mark.parametrize("whiten", [False, True])
+def test_quad_limb_dark(whiten):
+    np.random.seed(9876)
+    trans = tr.QuadLimbDarkTransform(whiten=whiten)
+    q = np.random.uniform(0, 1, (2, 10))
+    sqrtq1 = np.sqrt(q[0])
+    twoq2 = 2 * q[1]
+    x = np.stack([sqrtq1 * twoq2, sqrtq1 * (1 - twoq2)], axis=0)
+
+    y = trans.forward_val(x)
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+    assert np.allclose(x, trans.backward(tt.as_tensor_variable(y)).eval())
+
+    # Compare to the unwhitened transform
+    logit_q = np.log(q) - np.log(1 - q)
+    jac = trans.jacobian_det(tt.as_tensor_variable(y)).eval()
+    jac0 = tr.quad_limb_dark.jacobian_det(tt.as_tensor_variable(logit_q))
+    if whiten:
+        assert np.allclose(y, logit_q / (np.pi / np.sqrt(3)))
+        jac0 = jac0 + np.log(np.pi / np.sqrt(3))
+    else:
+        assert np.allclose(y, logit_q)
+    assert np.allclose(np.sum(jac, axis=0), np.sum(jac0.eval(), axis=0))
+
+
+def test_absolute_value():
+    np.random.seed(5432)
+    trans = tr.AbsoluteValueTransform()
+    x = np.random.uniform(0, 1, 10)
+
+    y = trans.forward_val(x)
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+    assert np.allclose(x, trans.backward(tt.as_tensor_variable(y)).eval())
+
+
+@pytest.mark.parametrize("scale", [1.0, 0.5, 3.0])
+def test_unit_vector_scale(scale):
+    np.random.seed(2468)
+    trans = tr.UnitVectorTransform(scale=scale)
+    y = scale * np.random.randn(5, 3)
+
+    x = trans.backward(tt.as_tensor_variable(y)).eval()
+    assert np.allclose(x, y / np.sqrt(np.sum(y ** 2, axis=-1))[:, None])
+
+    # This should be the log density of an isotropic normal with width scale
+    jac = trans.jacobian_det(tt.as_tensor_variable(y)).eval()
+    expect = -0.5 * np.sum((y / scale) ** 2, axis=-1) - 3 * np.log(scale)
+    assert np.allclose(jac, expect)
+
+
+def test_periodic_bounds():
+    with pytest.raises(TypeError):
+        tr.PeriodicTransform(tt.dscalar(), 1.0)
+
+
+def test_impact_parameter():
+    np.random.seed(1357)
+    ror = np.random.uniform(0.01, 0.2, 10)
+    trans = tr.ImpactParameterTransform(ror)
+    x = np.random.uniform(0, 1 + ror)
+
+    y = trans.forward_val(x)
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+    assert np.allclose(x, trans.backward(tt.as_tensor_variable(y)).eval())
+
+    # The Jacobian should be independent of ror after normalization
+    y_ = tt.as_tensor_variable(y)
+    grad = tt.grad(tt.sum(trans.backward(y_)), y_)
+    expect = (tt.log(grad) - tt.log(1 + ror)).eval()
+    assert np.allclose(trans.jacobian_det(y_).eval(), expect)
+
+
+def test_radius_impact_clip():
+    trans = tr.RadiusImpactTransform(0.01, 0.1)
+
+    # These points are on or just outside the boundary of the support
+    x = np.array([[0.01, 0.1, 0.05, 0.05], [0.5, 0.5, 1.06, 1.2]])
+    y = trans.forward_val(x)
+    assert np.all(np.isfinite(y))
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+
+
+@pytest.mark.parametrize("symbolic", [True, False])
+def test_radius_impact_forward_val_array_bounds(symbolic):
+    np.random.seed(8642)
+    min_radius = np.random.uniform(0.01, 0.05, (32, 3))
+    max_radius = min_radius + np.random.uniform(0.05, 0.1, (32, 3))
+    if symbolic:
+        trans = tr.RadiusImpactTransform(
+            tt.as_tensor_variable(min_radius),
+            tt.as_tensor_variable(max_radius),
+        )
+    else:
+        trans = tr.RadiusImpactTransform(min_radius, max_radius)
+
+    # The support excludes 1 < b <= 1 + min_radius
+    p = np.random.uniform(min_radius, max_radius)
+    b = np.random.uniform(0, 1 + p - min_radius)
+    b = np.where(b > 1, b + min_radius, b)
+    x = np.stack((p, b), axis=0)
+
+    y = trans.forward_val(x)
+    assert np.shape(y) == np.shape(x)
+    assert np.all(np.isfinite(y))
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+    assert np.allclose(x, trans.backward(tt.as_tensor_variable(y)).eval())
+
+
+@pytest.mark.parametrize("mode", ["FAST_COMPILE", "FAST_RUN"])
+def test_logit_jac_stable(mode):
+    y = tt.dvector()
+    func = theano.function([y], tr._logit_jac(y), mode=mode)
+    assert np.allclose(
+        func(np.array([-800.0, 0.0, 800.0])), [-800.0, -2 * np.log(2), -800.0]
+    )
+
+
+@pytest.mark.parametrize("scale", [1.0, 0.5])
+def test_unit_vector_float32(scale):
+    with theano.configparser.change_flags(floatX="float32"):
+        trans = tr.UnitVectorTransform(scale=scale)
+        jac = trans.jacobian_det(tt.fmatrix())
+    assert jac.dtype == "float32"
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_radius_impact_numba(monkeypatch, dtype):
+    pytest.importorskip("numba")
+    np.random.seed(7531)
+    min_radius, max_radius = 0.01, 0.1
+    trans = tr.RadiusImpactTransform(min_radius, max_radius)
+    p = np.random.uniform(min_radius, max_radius, (5, 3))
+    b = np.random.uniform(0, 1 + p)
+    x = np.stack((p, b), axis=0).astype(dtype)
+    y = trans.forward_val(x)
+
+    # Compare the compiled kernel to the NumPy implementation
+    monkeypatch.setattr(tr, "_radius_impact_forward_val", None)
+    y0 = trans.forward_val(x)
+    assert y.dtype == y0.dtype
+    assert np.allclose(y, y0, rtol=1e-4 if dtype == np.float32 else 1e-5)
+
+
+@pytest.mark.parametrize("symbolic", [True, False])
+def test_radius_impact_mixed_bounds(symbolic):
+    np.random.seed(9753)
+    min_radius = 0.01
+    max_radius = np.array([0.1, 0.2])
+    if symbolic:
+        trans = tr.RadiusImpactTransform(
+            tt.as_tensor_variable(min_radius),
+            tt.as_tensor_variable(max_radius),
+        )
+    else:
+        trans = tr.RadiusImpactTransform(min_radius, max_radius)
+
+    # The support excludes 1 < b <= 1 + min_radius
+    p = np.random.uniform(min_radius, max_radius, (10, 2))
+    b = np.random.uniform(0, 1 + p - min_radius)
+    b = np.where(b > 1, b + min_radius, b)
+    x = np.stack((p, b), axis=0)
+
+    y = trans.forward_val(x)
+    assert np.shape(y) == np.shape(x)
+    assert np.all(np.isfinite(y))
+    assert np.allclose(y, trans.forward(tt.as_tensor_variable(x)).eval())
+    assert np.allclose(x, trans.backward(tt.as_tensor_variable(y)).eval())
+
+
+def test_quad_limb_dark_whiten_float32():
+    with theano.configparser.change_flags(floatX="float32"):
+        trans = tr.QuadLimbDarkTransform(whiten=True)
+        y = tt.fmatrix()
+        assert trans.backward(y).dtype == "float32"
+        assert trans.forward(y).dtype == "float32"
+        assert trans.jacobian_det(y).dtype == "float32"
+
+
+@pytest.mark.parametrize("scale", [np.array([1.0, 2.0, 3.0]), 0.0, -1.0])
+def test_unit_vector_invalid_scale(scale):
+    with pytest.raises(ValueError):
+        tr.UnitVectorTransform(scale=scale)